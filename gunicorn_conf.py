@@ -0,0 +1,16 @@
+'''
+Gunicorn configuration for running the app behind a real WSGI server
+instead of the Werkzeug development server:
+
+    gunicorn -c gunicorn_conf.py main:app
+'''
+import multiprocessing
+
+bind = "0.0.0.0:5000"
+workers = (2 * multiprocessing.cpu_count()) + 1
+threads = 2
+
+# import main.py once in the master so its warmup (numba compilation,
+# font cache, first figure) is shared by the workers via fork
+# copy-on-write rather than repeated per worker
+preload_app = True
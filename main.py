@@ -1,12 +1,55 @@
-from flask import Flask, render_template, request
-import base64
+from flask import Flask, abort, render_template, request, url_for
+import threading
+from functools import lru_cache
 from io import BytesIO
+from math import sqrt
+import matplotlib
+matplotlib.use('Agg')  # headless backend, set before any canvas exists
+from matplotlib.backends.backend_svg import FigureCanvasSVG
+from matplotlib.collections import LineCollection
 from matplotlib.figure import Figure
 import numpy as np
 # import matplotlib.pyplot as plt
 
+try:
+    from numba import njit
+except ImportError:
+    # numba is optional - without it the stepping kernel runs as
+    # ordinary Python, which is slower but gives identical results
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+
+        def wrap(func):
+            return func
+        return wrap
+
 app = Flask(__name__)
 
+# each worker thread keeps one Figure and reuses it across requests,
+# so figure construction is paid once per thread instead of per request
+_TLS = threading.local()
+
+# pressure unit multipliers for converting form inputs to kPa
+_UNIT = {"kpa": 1.0, "bar": 100.0, "atm": 101.325}
+
+# hard bound on the stepping loops so pathological inputs (e.g. an
+# unreachable bottoms composition) cannot hang a worker indefinitely
+MAX_STAGES = 500
+
+# x-axis of the diagram; only depends on constants, so build it once
+# at import instead of np.linspace-ing on every request
+_XA = np.linspace(0, 1, 100)
+_XA.setflags(write=False)
+
+# the axes are always the 0-1 unit square, so the gridline segments
+# can be tabulated once and drawn as a single LineCollection instead
+# of the per-tick grid artists managed by ax.grid(True)
+_GRID_TICKS = np.linspace(0, 1, 11)
+_GRID_SEGS = ([[(t, 0), (t, 1)] for t in _GRID_TICKS]
+              + [[(0, t), (1, t)] for t in _GRID_TICKS])
+
+
 def eq_og(xa, relative_volatility):
     '''
     DESCRIPTION
@@ -43,6 +86,32 @@ def eq(xa, relative_volatility, nm):
     return ya
 
 
+@lru_cache(maxsize=128)
+def equilibrium_curves(relative_volatility, nm):
+    '''
+    DESCRIPTION
+    Returns both equilibrium curves evaluated over the shared
+    x-axis _XA. The curves only depend on the two arguments, so
+    results are memoized and repeat requests for the same system
+    skip the array work entirely.
+    INPUTS:
+    relative_volatility     : Relative Volatility
+    nm                      : Murphree Efficiency
+    OUTPUTS:
+    ya_og                   : Vapour Composition curve
+    ya_eq                   : Vapour Composition curve accounting for
+                              the Murphree Efficiency
+    '''
+    # evaluate the Raoult expression once and derive the Murphree
+    # curve from it, rather than recomputing it via eq_og() then eq()
+    ya_og = (relative_volatility * _XA) / (1 + (relative_volatility - 1) * _XA)
+    ya_eq = ((ya_og - _XA) * nm) + _XA  # using definition of murphree efficiency
+    # cached arrays are shared between requests, so freeze them
+    ya_og.setflags(write=False)
+    ya_eq.setflags(write=False)
+    return ya_og, ya_eq
+
+
 def eq2(ya, relative_volatility, nm):
     '''
     DESCRIPTION
@@ -61,57 +130,249 @@ def eq2(ya, relative_volatility, nm):
     a = ((relative_volatility * nm) - nm - relative_volatility + 1)
     b = ((ya * relative_volatility) - ya + nm - 1 - (relative_volatility * nm))
     c = ya
-    xa = (-b - np.sqrt((b ** 2) - (4 * a * c))) / (2 * a)  # solving quadratic using
-    # quadratic formula
+    xa = (-b - sqrt((b ** 2) - (4 * a * c))) / (2 * a)  # solving quadratic using
+    # quadratic formula. math.sqrt because everything here is scalar;
+    # np.sqrt would pay ufunc dispatch on every stepping iteration
     return xa
 
 
-def stepping_ESOL(x1, y1, relative_volatility, R, xd, nm):
+@njit(cache=True, fastmath=True)
+def run_mccabe(xd, xb, relative_volatility, R, nm, ESOL_q_x, ESOL_q_y,
+               max_stages):
     '''
     DESCRIPTION:
-    Performs a single step over the ESOL
-    operating line.
+    Steps down the ESOL operating line until the q-line, then down
+    the SSOL operating line until the bottoms composition, collecting
+    every step into one preallocated array. This is the numeric hot
+    loop of the construction, so it is compiled with numba and only
+    uses scalar arithmetic that lowers to native code.
     INPUTS:
-    x1                      : Initial liquid composition on ESOL
-    y1                      : Initial vapour composition on ESOL
+    xd                      : Distillate composition
+    xb                      : Bottoms composition
     relative_volatility     : Relative Volatility
     R                       : Reflux Ratio
-    xd                      : Distillate Composition
+    nm                      : Murphree Efficiency
+    ESOL_q_x                : Point at which ESOL intersects q-line (x)
+    ESOL_q_y                : Point at which ESOL intersects q-line (y)
+    max_stages              : Size of the preallocated step array
     OUTPUTS:
-    x1      : Initial liquid composition
-    x2      : Liquid composition after stepping
-    y1      : Initial vapour composition
-    y2      : Vapour composition after stepping
+    steps       : (N,4) array with one (x1, x2, y1, y2) row per step
+    stages      : Number of equilibrium stages
+    feed_stage  : Optimum feed stage
+    xb_actual   : Actual bottoms composition reached
     '''
-    x2 = eq2(y1, relative_volatility, nm)  # getting new liquid comp
-    y2 = (((R * x2) / (R + 1)) + (xd / (R + 1)))  # ESOL equation
-    return x1, x2, y1, y2
-
-
-def stepping_SSOL(x1, y1, relative_volatility, ESOL_q_x, ESOL_q_y, xb, nm):
+    steps = np.empty((max_stages, 4))
+
+    # coefficients of the eq2() quadratic, hoisted out of the loops:
+    # the leading coefficient factors as (rv-1)(nm-1) and the linear
+    # one splits into ya*(rv-1) plus a constant, so only the
+    # ya-dependent parts remain per step
+    a = (relative_volatility - 1) * (nm - 1)
+    k2 = nm - 1 - (relative_volatility * nm)
+    inv_2a = 0.5 / a
+    inv_Rp1 = 1 / (R + 1)  # one division instead of two per ESOL step
+
+    n = 0
+    x1 = xd
+    y1 = xd
+    while True:  # up until the q-line, step down
+        # inverse of eq(), see eq2()
+        b = (y1 * (relative_volatility - 1)) + k2
+        x2 = (-b - sqrt((b * b) - (4 * a * y1))) * inv_2a
+        y2 = ((R * x2) + xd) * inv_Rp1  # ESOL equation
+        steps[n, 0] = x1
+        steps[n, 1] = x2
+        steps[n, 2] = y1
+        steps[n, 3] = y2
+        n += 1
+        if x2 <= ESOL_q_x or n >= max_stages:
+            break
+        x1 = x2
+        y1 = y2
+    feed_stage = n  # optimum feed stage
+
+    # the SSOL section restarts from the last ESOL corner
+    m = ((xb - ESOL_q_y) / (xb - ESOL_q_x))  # gradient of SSOL
+    c = ESOL_q_y - (m * ESOL_q_x)  # intercept of SSOL
+    x1 = steps[n - 1, 0]
+    y1 = steps[n - 1, 2]
+    while n < max_stages:  # while composition is greater than desired
+        b = (y1 * (relative_volatility - 1)) + k2  # inverse of eq()
+        x2 = (-b - sqrt((b * b) - (4 * a * y1))) * inv_2a
+        y2 = (m * x2) + c  # SSOL equation in form 'y=mx+c'
+        steps[n, 0] = x1
+        steps[n, 1] = x2
+        steps[n, 2] = y1
+        steps[n, 3] = y2
+        n += 1
+        if x2 <= xb:
+            break
+        x1 = x2
+        y1 = y2
+    return steps[:n], n - 1, feed_stage, steps[n - 1, 1]
+
+@lru_cache(maxsize=256)
+def _render(PaVap, PbVap, R_factor, xf, xd, xb, q, nm):
     '''
     DESCRIPTION:
-    Performs a single step over the SSOL
-    operating line.
+    Performs the McCabe-Thiele construction for one set of inputs and
+    renders the diagram, returning it as SVG bytes. Results are
+    memoized so repeat submissions of the same form (page reloads,
+    bookmarks) skip both the numeric work and the figure rendering.
+    Callers should round the inputs before calling to maximize the
+    hit rate.
     INPUTS:
-    x1                      : Initial liquid composition on ESOL
-    y1                      : Initial vapour composition on ESOL
-    relative_volatility     : Relative Volatility
-    ESOL_q_x                : Point at which ESOL intersects q-line (x)
-    ESOL_q_y                : Point at which ESOL intersects q-line (y)
-    xb                      : Bottoms composition
+    PaVap       :Vapour pressure of component a (more volatile)
+    PbVap       :Vapour pressure of component b (less volatile)
+    R_factor    :Amount Rmin is scaled by to obtain the actual reflux ratio
+    xf          :Feed composition
+    xd          :Distillate composition
+    xb          :Bottoms composition
+    q           :Liquid fraction of feed
+    nm          :Murphree Efficiency
     OUTPUTS:
-    x1      : Initial liquid composition
-    x2      : Liquid composition after stepping
-    y1      : Initial vapour composition
-    y2      : Vapour composition after stepping
+    data        :The rendered McCabe-Thiele plot as SVG bytes, or
+                 None if the construction did not converge within
+                 MAX_STAGES stages
     '''
+    # Ensuring errors don't occur regarding dividing by 0
+    if q == 1:
+        q -= 0.00000001
+    if q == 0:
+        q += 0.00000001
+    if nm == 1:
+        nm -= 0.00000001
+
+    relative_volatility = PaVap / PbVap  # obtaining relative volatility from definition
+    if relative_volatility == 1:
+        # equal vapour pressures make the leading coefficient of every
+        # quadratic below zero - nudge off the boundary like q and nm
+        relative_volatility += 0.00000001
+    xa = _XA  # x-axis, shared across requests
+    ya_og, ya_eq = equilibrium_curves(relative_volatility, nm)
+    # original equilibrium data, and the modified equilibrium data
+    # taking into account the Murphree Efficiency
+
+    # finding where the q-line intersects the equilibrium curve
+    # takes the form of a quadratic equation. The two q-line ratios
+    # recur throughout, so divide once and reuse
+    inv_1mq = 1 / (1 - q)
+    qq = q / (q - 1)
+    al = relative_volatility
+    a = (al * qq) - al + (al * nm) - qq + 1 - nm
+    b = qq - 1 + nm + ((al * xf) * inv_1mq) - (xf * inv_1mq) - (al * nm)
+    c = xf * inv_1mq
+
+    if q > 1:
+        q_eqX = (-b + sqrt((b ** 2) - (4 * a * c))) / (2 * a)
+    else:
+        q_eqX = (-b - sqrt((b ** 2) - (4 * a * c))) / (2 * a)
+    # where the q-line intersects the equilibrium curve (x-axis)
+    q_eqy = eq(q_eqX, relative_volatility, nm)
+    # where the q-line intersects the equilibrium curve (y-axis)
+
+    theta_min = xd * (1 - ((xd - q_eqy) / (xd - q_eqX)))  # ESOL y-intercept to obtain Rmin
+    R_min = (xd / theta_min) - 1  # finding Rmin
+    R = R_factor * R_min  # multiplying by R_factor to obtain R
+    theta = (xd / (R + 1))  # finding new ESOL y-intercept
+
+    ESOL_q_x = ((theta - (xf * inv_1mq)) / (qq - ((xd - theta) / xd)))
+    # Where the new ESOL intercepts the q-line (x-axis)
+    ESOL_q_y = (ESOL_q_x * ((xd - theta) / xd)) + theta
+    # Where the new ESOL intercepts the q-line (y-axis)
+
+    steps, stages, feed_stage, xb_actual = run_mccabe(
+        xd, xb, relative_volatility, R, nm, ESOL_q_x, ESOL_q_y, MAX_STAGES)
+    if len(steps) == MAX_STAGES and xb_actual > xb:
+        # ran out of stages without reaching the bottoms composition;
+        # report it instead of rendering a misleading diagram
+        return None
+
+    # Visualize Data. The figure is thread local, so each worker thread
+    # builds into its own reused Figure without cross-thread sharing
+    fig = getattr(_TLS, 'fig', None)
+    if fig is None:
+        fig = _TLS.fig = Figure(figsize=(10, 8))
+        _TLS.canvas = FigureCanvasSVG(fig)  # reused along with the figure
+        fig.subplots()
+    ax = fig.gca()
+    ax.clear()  # wipe the previous request's artists
+
+    # plt.figure()  # The following code plots the Mccabe Thiele diagram
+    ax.axis([0, 1, 0, 1])  # creating axes between 0-1
+    ax.plot([xd, xd], [0, xd], color='k', linestyle='--')  # distillate comp line
+    ax.plot([xb, xb], [0, xb], color='k', linestyle='--')  # bottoms comp line
+    ax.plot([xf, xf], [0, xf], color='k', linestyle='--')  # feed comp line
+
+    # plt.plot([xd,0],[xd,theta_min],color='r',linestyle='--') # ESOL at Rmin
+    '''UN-COMMENT TO SEE ESOL FOR Rmin ^^^'''
+
+    ax.plot([xd, ESOL_q_x], [xd, ESOL_q_y], color='k')  # ESOL at R
+    ax.plot([xb, ESOL_q_x], [xb, ESOL_q_y], color='k')  # SSOL
+
+    # two segments per step (across then down) plus the final drop to
+    # the x-axis, handed to the renderer as one LineCollection instead
+    # of one Line2D artist per segment
+    segs = np.empty((2 * len(steps) + 1, 2, 2))
+    segs[0:-1:2, 0, 0] = steps[:, 0]  # step across: (x1,y1) -> (x2,y1)
+    segs[0:-1:2, 0, 1] = steps[:, 2]
+    segs[0:-1:2, 1, 0] = steps[:, 1]
+    segs[0:-1:2, 1, 1] = steps[:, 2]
+    segs[1:-1:2, 0, 0] = steps[:, 1]  # step down: (x2,y1) -> (x2,y2)
+    segs[1:-1:2, 0, 1] = steps[:, 2]
+    segs[1:-1:2, 1, 0] = steps[:, 1]
+    segs[1:-1:2, 1, 1] = steps[:, 3]
+    segs[-1] = ((xb_actual, steps[-1, 2]), (xb_actual, 0.0))
+    ax.add_collection(LineCollection(segs, colors='k', linewidths=1.5))
+
+    ax.plot(xa, xa, color='k')  # x=y line
+    ax.plot(xa, ya_og, color='k')  # equilibrium curve
+    ax.plot(xa, ya_eq, color='g', linestyle='--')  # equilibrium curve (with efficiency)
+    ax.plot([xf, ESOL_q_x], [xf, ESOL_q_y], color='k')  # q- line
+
+    # plt.plot([ESOL_q_x,q_eqX],[ESOL_q_y,q_eqy],color='r',linestyle='--') #q- line
+    '''UN-COMMENT TO SEE FULL q LINE ^^^'''
+
+    # stage labels go on in one pass after all the line art, so the
+    # font machinery isn't interleaved with artist construction
+    for i in range(len(steps)):
+        if i < feed_stage:
+            ax.text(steps[i, 1] - 0.045, steps[i, 2] + 0.045, i + 1)
+        elif i > feed_stage:
+            ax.text(steps[i, 1] - 0.045, steps[i, 2] + 0.045, i)
+
+    ax.set_xlabel('xa')  # Just a few labels and information...
+    ax.set_ylabel('ya')
+    ax.text(0.6, 0.5, f'Rmin= {R_min:.3f}')
+    ax.text(0.6, 0.45, f'R= {R:.3f}')
+    ax.text(0.6, 0.4, f'xb actual= {xb_actual:.3f}')
+    ax.text(0.6, 0.35, f'Stages= {stages}')
+    ax.text(0.6, 0.3, f'Feed Stage= {feed_stage}')
+    ax.set_title(f'xd={xd}\n'
+                 f'xb={xb}   xd={xd}\n'
+                 f'xf={xf}    q={q:.3f}\n'
+                 f'R={R_factor}*Rmin   Murphree Efficiency={nm}')
+    # wack the grid on for bonus points (precomputed segments, one artist)
+    ax.add_collection(LineCollection(_GRID_SEGS, colors='#b0b0b0',
+                                     linewidths=0.8, zorder=0))
+
+    buf = BytesIO()
+    # SVG keeps line art as text: no rasterization, no zlib DEFLATE,
+    # and a much smaller payload than PNG for a plot like this.
+    # print_svg on the cached canvas skips savefig's format detection
+    # and dpi/bbox argument handling
+    _TLS.canvas.print_svg(buf)
+
+    return buf.getvalue()
+
+
+# render one diagram at import time: this compiles the numba kernel,
+# builds matplotlib's font cache and creates the first figure, so the
+# first real request doesn't pay any of those one-off costs. Under
+# gunicorn --preload it runs once in the master before the workers
+# fork and share the warmed state copy-on-write
+_render(179.2, 74.3, 1.3, 0.5, 0.95, 0.05, 0.5, 0.75)
 
-    x2 = eq2(y1, relative_volatility, nm)  # getting new liquid comp
-    m = ((xb - ESOL_q_y) / (xb - ESOL_q_x))  # gradient of SSOL
-    c = ESOL_q_y - (m * ESOL_q_x)  # intercept of SSOL
-    y2 = (m * x2) + c  # SSOL equation in form 'y=mx+c'
-    return x1, x2, y1, y2
 
 @app.route("/", methods=['GET', 'POST'])
 def McCabeThiele():
@@ -133,153 +394,67 @@ def McCabeThiele():
     A McCabe-Thiele plot, displaying optimum number of equilibrium stages,
     optimum feed stage, actual reflux ratio, actual bottoms composition.
     '''
-    data = ""
-    PbVap = 0
-    PaVap = 0
+    plot_url = None
+    error = None
     if request.method == "POST":
         '''PARAMETERS'''
-        PaVap_parameter = request.form.get("PaVap_parameter")
-        PbVap_parameter = request.form.get("PbVap_parameter")
-
-        if PaVap_parameter == "kpa":
-            PaVap += float(request.form.get("PaVap"))
-        elif PaVap_parameter == "bar":
-            PaVap += float(request.form.get("PaVap"))
-            PaVap *= 100
-        elif PaVap_parameter == "atm":
-            PaVap += float(request.form.get("PaVap"))
-            PaVap *= 101.325
-
-        if PbVap_parameter == "kpa":
-            PbVap += float(request.form.get("PbVap"))
-        elif PbVap_parameter == "bar":
-            PbVap += float(request.form.get("PbVap"))
-            PbVap *= 100
-        elif PbVap_parameter == "atm":
-            PbVap += float(request.form.get("PbVap"))
-            PbVap *= 101.325
-
-        R_factor = float(request.form.get("R_factor"))
-        xf = float(request.form.get("xf"))
-        xd = float(request.form.get("xd"))
-        xb = float(request.form.get("xb"))
-        q = float(request.form.get("q"))
-        nm = float(request.form.get("nm"))
-
-        # Ensuring errors don't occur regarding dividing by 0
-        if q == 1:
-            q -= 0.00000001
-        if q == 0:
-            q += 0.00000001
-
-        relative_volatility = PaVap / PbVap  # obtaining relative volatility from definition
-        xa = np.linspace(0, 1, 100)  # creating x-axis
-        ya_og = eq_og(xa[:], relative_volatility)  # getting original equilibrium data
-        ya_eq = eq(xa[:], relative_volatility, nm)  # getting modified equilibrium data
-        # taking into account the Murphree Efficiency
-
-        x_line = xa[:]  # creating data-points for y=x line
-        y_line = xa[:]
-
-        # finding where the q-line intersects the equilibrium curve
-        # takes the form of a quadratic equation
-        al = relative_volatility
-        a = ((al * q) / (q - 1)) - al + (al * nm) - (q / (q - 1)) + 1 - nm
-        b = (q / (q - 1)) - 1 + nm + ((al * xf) / (1 - q)) - (xf / (1 - q)) - (al * nm)
-        c = xf / (1 - q)
-
-        if q > 1:
-            q_eqX = (-b + np.sqrt((b ** 2) - (4 * a * c))) / (2 * a)
+        form = request.form
+        PaVap = float(form["PaVap"]) * _UNIT[form["PaVap_parameter"]]
+        PbVap = float(form["PbVap"]) * _UNIT[form["PbVap_parameter"]]
+
+        # round so float noise in equivalent submissions still hits
+        # the render cache (and the browser cache for /plot)
+        params = {"PaVap": round(PaVap, 6), "PbVap": round(PbVap, 6),
+                  "R_factor": round(float(form["R_factor"]), 6),
+                  "xf": round(float(form["xf"]), 6),
+                  "xd": round(float(form["xd"]), 6),
+                  "xb": round(float(form["xb"]), 6),
+                  "q": round(float(form["q"]), 6),
+                  "nm": round(float(form["nm"]), 6)}
+
+        # render (or hit the cache) now so non-convergence can be
+        # reported on the page; /plot then serves the cached bytes
+        if _render(*params.values()) is None:
+            error = ("The construction did not converge within "
+                     + str(MAX_STAGES) + " equilibrium stages. "
+                     "Check that the compositions and reflux settings "
+                     "are feasible.")
         else:
-            q_eqX = (-b - np.sqrt((b ** 2) - (4 * a * c))) / (2 * a)
-        # where the q-line intersects the equilibrium curve (x-axis)
-        q_eqy = eq(q_eqX, relative_volatility, nm)
-        # where the q-line intersects the equilibrium curve (y-axis)
-
-        theta_min = xd * (1 - ((xd - q_eqy) / (xd - q_eqX)))  # ESOL y-intercept to obtain Rmin
-        R_min = (xd / theta_min) - 1  # finding Rmin
-        R = R_factor * R_min  # multiplying by R_factor to obtain R
-        theta = (xd / (R + 1))  # finding new ESOL y-intercept
-
-        ESOL_q_x = ((theta - (xf / (1 - q))) / ((q / (q - 1)) - ((xd - theta) / xd)))
-        # Where the new ESOL intercepts the q-line (x-axis)
-        ESOL_q_y = (ESOL_q_x * ((xd - theta) / xd)) + theta
-        # Where the new ESOL intercepts the q-line (y-axis)
-
-        # Visualize Data
-        fig = Figure(figsize=(10, 8))
-        ax = fig.subplots()
-
-        # plt.figure()  # The following code plots the Mccabe Thiele diagram
-        ax.axis([0, 1, 0, 1])  # creating axes between 0-1
-        ax.plot([xd, xd], [0, xd], color='k', linestyle='--')  # distillate comp line
-        ax.plot([xb, xb], [0, xb], color='k', linestyle='--')  # bottoms comp line
-        ax.plot([xf, xf], [0, xf], color='k', linestyle='--')  # feed comp line
-
-        # plt.plot([xd,0],[xd,theta_min],color='r',linestyle='--') # ESOL at Rmin
-        '''UN-COMMENT TO SEE ESOL FOR Rmin ^^^'''
-
-        ax.plot([xd, ESOL_q_x], [xd, ESOL_q_y], color='k')  # ESOL at R
-        ax.plot([xb, ESOL_q_x], [xb, ESOL_q_y], color='k')  # SSOL
-
-        x1, x2, y1, y2 = stepping_ESOL(xd, xd, relative_volatility, R, xd, nm)
-        step_count = 1  # current number of equilibrium stages
-        ax.plot([x1, x2], [y1, y1], color='k')  # Step_1
-        ax.plot([x2, x2], [y1, y2], color='k')  # Step_2
-        ax.text(x2 - 0.045, y1 + 0.045, step_count)
-        while x2 > ESOL_q_x:  # up until the q-line, step down
-            x1, x2, y1, y2 = stepping_ESOL(x2, y2, relative_volatility, R, xd, nm)
-            ax.plot([x1, x2], [y1, y1], color='k')
-            ax.plot([x2, x2], [y1, y2], color='k')
-            step_count += 1  # incrementing equilibrium stage count
-            ax.text(x2 - 0.045, y1 + 0.045, step_count)  # label the stage
-
-        feed_stage = step_count  # obtaining optimum feed stage
-
-        x1, x2, y1, y2 = stepping_SSOL(x1, y1, relative_volatility, ESOL_q_x, ESOL_q_y, xb, nm)
-        ax.plot([x1, x2], [y1, y1], color='k')
-        ax.plot([x2, x2], [y1, y2], color='k')
-        step_count += 1
-        while x2 > xb:  # while the composition is greater than desired
-            x1, x2, y1, y2 = stepping_SSOL(x2, y2, relative_volatility, ESOL_q_x, ESOL_q_y, xb, nm)
-            # continue stepping...
-            ax.plot([x1, x2], [y1, y1], color='k')
-            ax.plot([x2, x2], [y1, y2], color='k')
-            ax.text(x2 - 0.045, y1 + 0.045, step_count)  # label stage
-            step_count += 1  # increment equilibrium stage counter
-        ax.plot([x2, x2], [y1, 0], color='k')
-        xb_actual = x2
-        stages = step_count - 1
-        ax.plot(x_line, y_line, color='k')  # x=y line
-        ax.plot(xa, ya_og, color='k')  # equilibrium curve
-        ax.plot(xa, ya_eq, color='g', linestyle='--')  # equilibrium curve (with efficiency)
-        ax.plot([xf, ESOL_q_x], [xf, ESOL_q_y], color='k')  # q- line
-
-        # plt.plot([ESOL_q_x,q_eqX],[ESOL_q_y,q_eqy],color='r',linestyle='--') #q- line
-        '''UN-COMMENT TO SEE FULL q LINE ^^^'''
-
-        ax.set_xlabel('xa')  # Just a few labels and information...
-        ax.set_ylabel('ya')
-        ax.text(0.6, 0.5, 'Rmin= ' + str(round(R_min, 3)))
-        ax.text(0.6, 0.45, 'R= ' + str(round(R, 3)))
-        ax.text(0.6, 0.4, 'xb actual= ' + str(round(xb_actual, 3)))
-        ax.text(0.6, 0.35, 'Stages= ' + str(stages))
-        ax.text(0.6, 0.3, 'Feed Stage= ' + str(feed_stage))
-        ax.set_title('xd=' + str(xd) + '\n' + \
-                  'xb=' + str(xb) + \
-                  '   xd=' + str(xd) + '\n' + \
-                  'xf=' + str(xf) + \
-                  '    q=' + str(round(q, 3)) + '\n' + \
-                  'R=' + str(R_factor) + '*Rmin' + \
-                  '   Murphree Efficiency=' + str(nm))
-        ax.grid(True)  # wack the grid on for bonus points
-
-        buf = BytesIO()
-        fig.savefig(buf, format="png")
-
-        data += base64.b64encode(buf.getbuffer()).decode("ascii")
-
-    return render_template("index.html", data=data)
+            plot_url = url_for("plot", **params)
+
+    return render_template("index.html", plot_url=plot_url, error=error)
+
+
+@app.route("/plot")
+def plot():
+    '''
+    DESCRIPTION:
+    Streams the rendered diagram for one set of query parameters.
+    Serving the image from its own URL instead of a base64 data-URI
+    keeps the page payload small and lets the browser cache repeat
+    views of the same diagram.
+    INPUTS:
+    The eight numeric parameters of _render(...), as query arguments.
+    OUTPUTS:
+    The McCabe-Thiele plot as an image/svg+xml response.
+    '''
+    try:
+        values = [round(float(request.args[k]), 6)
+                  for k in ("PaVap", "PbVap", "R_factor", "xf", "xd",
+                            "xb", "q", "nm")]
+    except (KeyError, ValueError):
+        abort(400)
+
+    data = _render(*values)
+    if data is None:
+        abort(400)  # non-converging inputs requested directly
+
+    # hand the cached bytes straight to the response - no BytesIO
+    # wrapper, no send_file bookkeeping, no extra copy of the payload
+    response = app.response_class(data, mimetype="image/svg+xml")
+    # identical-parameter reloads can come straight from browser cache
+    response.headers["Cache-Control"] = "public, max-age=3600"
+    return response
 
 if __name__ == "__main__":
     app.run(debug=True, host="0.0.0.0", port=5000)